@@ -1,5 +1,9 @@
 # type: ignore
+import os
+
+import Bio.PDB
 from biobb_common.tools import test_fixtures as fx
+from scipy.spatial import cKDTree
 from biobb_structure_utils.utils.closest_residues import closest_residues
 
 
@@ -15,3 +19,41 @@ class TestClosestResidues():
         closest_residues(properties=self.properties, **self.paths)
         assert fx.not_empty(self.paths['output_residues_path'])
         assert fx.equal(self.paths['output_residues_path'], self.paths['reference_output_residues_path'])
+
+    def test_neighbours(self):
+        output_path = 'output_neighbours_path.pdb'
+        closest_residues(input_structure_path=self.paths['input_structure_path'], output_residues_path=output_path, properties={'residues': [61], 'radius': self.properties['radius']})
+
+        # residues found by querying every atom of residue 61 against a cKDTree of the whole structure
+        parser = Bio.PDB.PDBParser(QUIET=True)
+        atoms = list(parser.get_structure('input', self.paths['input_structure_path']).get_atoms())
+        tree = cKDTree([atom.coord for atom in atoms])
+        targets = [atom.coord for atom in atoms if atom.get_parent().get_id()[1] == 61]
+        expected = {atoms[i].get_parent().get_full_id()[2:] for idx in tree.query_ball_point(targets, r=self.properties['radius']) for i in idx}
+
+        found = {residue.get_full_id()[2:] for residue in parser.get_structure('output', output_path).get_residues()}
+        assert found == expected
+
+    def test_modified_input(self):
+        input_path = 'input_modified.pdb'
+        properties = {'residues': [{'res_id': '61', 'chain': 'A'}], 'radius': self.properties['radius']}
+        with open(self.paths['input_structure_path']) as f:
+            lines = f.readlines()
+        with open(input_path, 'w') as f:
+            f.writelines(lines)
+        closest_residues(input_structure_path=input_path, output_residues_path='output_original_path.pdb', properties=properties)
+        stat = os.stat(input_path)
+
+        # same size and modification time, residue A 61 moved away from the rest of the structure
+        with open('input_modified.tmp', 'w') as f:
+            f.writelines(line[:30] + '%8.3f' % 999.0 + line[38:] if line.startswith('ATOM') and line[21:26] == 'A  61' else line for line in lines)
+        os.replace('input_modified.tmp', input_path)
+        os.utime(input_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        assert os.stat(input_path).st_size == stat.st_size
+        closest_residues(input_structure_path=input_path, output_residues_path='output_modified_path.pdb', properties=properties)
+
+        parser = Bio.PDB.PDBParser(QUIET=True)
+        original = {residue.get_full_id()[2:] for residue in parser.get_structure('original', 'output_original_path.pdb').get_residues()}
+        modified = {residue.get_full_id()[2:] for residue in parser.get_structure('modified', 'output_modified_path.pdb').get_residues()}
+        assert len(original) > 1
+        assert modified == {('A', (' ', 61, ' '))}
@@ -0,0 +1,24 @@
+# type: ignore
+from biobb_common.tools import test_fixtures as fx
+from biobb_structure_utils.utils.closest_residues import closest_residues
+
+
+class TestClosestResiduesModel():
+    def setup_class(self):
+        fx.test_setup(self, 'closest_residues_model')
+
+    def teardown_class(self):
+        fx.test_teardown(self)
+        pass
+
+    def test_launch(self):
+        closest_residues(properties=self.properties, **self.paths)
+        assert fx.not_empty(self.paths['output_residues_path'])
+        assert fx.equal(self.paths['output_residues_path'], self.paths['reference_output_residues_path'])
+        with open(self.paths['output_residues_path']) as f:
+            lines = f.readlines()
+        assert sum(1 for line in lines if line.startswith('MODEL')) == 1
+        assert sum(1 for line in lines if line.startswith('ENDMDL')) == 1
+        with open(self.paths['input_structure_path']) as f:
+            input_atoms = {line[6:27] for line in f if line.startswith(('ATOM', 'HETATM'))}
+        assert {line[6:27] for line in lines if line.startswith(('ATOM', 'HETATM'))} <= input_atoms
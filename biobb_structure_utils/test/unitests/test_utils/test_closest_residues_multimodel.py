@@ -0,0 +1,28 @@
+# type: ignore
+from biobb_common.tools import test_fixtures as fx
+from biobb_structure_utils.utils.closest_residues import closest_residues
+
+
+class TestClosestResiduesMultimodel():
+    def setup_class(self):
+        fx.test_setup(self, 'closest_residues_multimodel')
+
+    def teardown_class(self):
+        fx.test_teardown(self)
+        pass
+
+    def test_launch(self):
+        closest_residues(properties=self.properties, **self.paths)
+        assert fx.not_empty(self.paths['output_residues_path'])
+        assert fx.equal(self.paths['output_residues_path'], self.paths['reference_output_residues_path'])
+        with open(self.paths['output_residues_path']) as f:
+            assert sum(1 for line in f if line.startswith('MODEL')) == 20
+
+    def test_atom_numbering(self):
+        closest_residues(properties=self.properties, **self.paths)
+        with open(self.paths['input_structure_path']) as f:
+            input_atoms = {line[6:27] for line in f if line.startswith(('ATOM', 'HETATM'))}
+        with open(self.paths['output_residues_path']) as f:
+            output_atoms = [line[6:27] for line in f if line.startswith(('ATOM', 'HETATM'))]
+        assert output_atoms
+        assert set(output_atoms) <= input_atoms
@@ -0,0 +1,22 @@
+# type: ignore
+import pytest
+from biobb_common.tools import test_fixtures as fx
+from biobb_structure_utils.utils.extract_chain import extract_chain
+
+
+class TestExtractChainPlain():
+    def setup_class(self):
+        fx.test_setup(self, 'extract_chain_plain')
+
+    def teardown_class(self):
+        fx.test_teardown(self)
+        pass
+
+    def test_launch(self):
+        extract_chain(properties=self.properties, **self.paths)
+        assert fx.not_empty(self.paths['output_structure_path'])
+        assert fx.equal(self.paths['output_structure_path'], self.paths['reference_output_structure_path'])
+
+    def test_missing_chain(self):
+        with pytest.raises(SystemExit):
+            extract_chain(input_structure_path=self.paths['input_structure_path'], output_structure_path='output_missing_chain.pdb', properties={'chains': ['Z']})
@@ -15,3 +15,8 @@ class TestExtractResidues:
         extract_residues(properties=self.properties, **self.paths)
         assert fx.not_empty(self.paths['output_residues_path'])
         assert fx.equal_txt(self.paths['output_residues_path'], self.paths['reference_output_residues_path'])
+
+    def test_properties_unchanged(self):
+        residues = [{'name': ' HIS ', 'model': '1'}, 61]
+        extract_residues(input_structure_path=self.paths['input_structure_path'], output_residues_path='output_unchanged_path.pdb', properties={'residues': residues})
+        assert residues == [{'name': ' HIS ', 'model': '1'}, 61]
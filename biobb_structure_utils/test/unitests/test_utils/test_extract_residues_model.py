@@ -0,0 +1,24 @@
+# type: ignore
+from biobb_common.tools import test_fixtures as fx
+from biobb_structure_utils.utils.extract_residues import extract_residues
+
+
+class TestExtractResiduesModel:
+    def setup_class(self):
+        fx.test_setup(self, 'extract_residues_model')
+
+    def teardown_class(self):
+        fx.test_teardown(self)
+        pass
+
+    def test_launch(self):
+        extract_residues(properties=self.properties, **self.paths)
+        assert fx.not_empty(self.paths['output_residues_path'])
+        assert fx.equal_txt(self.paths['output_residues_path'], self.paths['reference_output_residues_path'])
+
+    def test_crlf(self):
+        input_path = 'input_crlf.pdb'
+        with open(self.paths['input_structure_path'], 'rb') as f_in, open(input_path, 'wb') as f_out:
+            f_out.write(f_in.read().replace(b'\n', b'\r\n'))
+        extract_residues(input_structure_path=input_path, output_residues_path='output_crlf_path.pdb', properties=self.properties)
+        assert fx.equal_txt('output_crlf_path.pdb', self.paths['reference_output_residues_path'])
@@ -3,21 +3,31 @@
 """Module containing the ClosestResidues class and the command line interface."""
 
 import argparse
+import functools
+import itertools
+import os
+from collections import namedtuple
+from pathlib import PurePath
 from typing import Optional
 
 import Bio.PDB
+import numpy as np
 from biobb_common.configuration import settings
 from biobb_common.generic.biobb_object import BiobbObject
 from biobb_common.tools import file_utils as fu
 from biobb_common.tools.file_utils import launchlogger
+from scipy.spatial import cKDTree
 
 from biobb_structure_utils.utils.common import (
+    ResKey,
     _from_string_to_list,
     check_input_path,
     check_output_path,
     create_biopython_residue,
     create_output_file,
     create_residues_list,
+    group_residues_by_code,
+    is_valid_pdb,
 )
 
 
@@ -118,74 +128,44 @@ class ClosestResidues(BiobbObject):
         # get list of Residues from properties
         list_residues = create_residues_list(self.residues, self.out_log)
 
-        # load input into BioPython structure
-        structure = Bio.PDB.PDBParser(QUIET=True).get_structure(
-            "structure", self.stage_io_dict["in"]["input_structure_path"]
+        # load input into BioPython structure, reused while the file is unchanged
+        input_key = _file_key(self.io_dict["in"]["input_structure_path"])
+        loaded = _load_structure(*input_key)
+        res_arr = loaded.res_arr
+        atom_res_idx = loaded.atom_res_idx
+
+        # get target residues as a mask over residues
+        if list_residues:
+            mask = np.zeros(len(res_arr), dtype=bool)
+            for code, keys in group_residues_by_code(list_residues).items():
+                for key in keys:
+                    key_mask = np.ones(len(res_arr), dtype=bool)
+                    for c, value in zip(code, key):
+                        key_mask &= res_arr[c] == value
+                    mask |= key_mask
+        else:
+            mask = np.ones(len(res_arr), dtype=bool)
+
+        # get the atoms of target residues
+        target_idx = np.flatnonzero(mask[atom_res_idx])
+        # atoms sharing coordinates (ie: altlocs) give the same neighbours
+        target_coords = np.unique(loaded.coords[target_idx], axis=0)
+        # get KDTree and query all target atoms at once
+        tree = _load_structure_tree(*input_key)
+        idx_lists = tree.query_ball_point(target_coords, r=self.radius, workers=-1)
+        nearby_idx = np.unique(
+            np.fromiter(itertools.chain.from_iterable(idx_lists), dtype=np.intp)
         )
-
-        str_residues = []
-        # format selected residues
-        for residue in structure.get_residues():
-            r = create_biopython_residue(residue)
-            if list_residues:
-                for res in list_residues:
-                    match = True
-                    for code in res["code"]:
-                        if res[code].strip() != r[code].strip():
-                            match = False
-                            break
-                    if match:
-                        str_residues.append(r)
-            else:
-                str_residues.append(r)
-
-        # get target residues in BioPython format
-        target_residues = []
-        for sr in str_residues:
-            # try for residues, if exception, try as HETATM
-            try:
-                target_residues.append(
-                    structure[int(sr["model"]) - 1][sr["chain"]][int(sr["res_id"])]
-                )
-            except KeyError:
-                target_residues.append(
-                    structure[int(sr["model"]) - 1][sr["chain"]][
-                        "H_" + sr["name"], int(sr["res_id"]), " "
-                    ]
-                )
-            except Exception:
-                fu.log(
-                    self.__class__.__name__ + ": Unable to find residue %s",
-                    sr["res_id"],
-                    self.out_log,
-                )
-
-        # get all atoms from target_residues
-        target_atoms = Bio.PDB.Selection.unfold_entities(target_residues, "A")
-        # get all atoms of input structure
-        all_atoms = Bio.PDB.Selection.unfold_entities(structure, "A")
-        # generate NeighborSearch object
-        ns = Bio.PDB.NeighborSearch(all_atoms)
-        # set comprehension list
-        nearby_residues = {
-            res
-            for center_atom in target_atoms
-            for res in ns.search(center_atom.coord, self.radius, "R")
-        }
-
-        # format nearby residues to pure python objects
-        neighbor_residues = []
-        for residue in nearby_residues:
-            r = create_biopython_residue(residue)
-            neighbor_residues.append(r)
+        nearby_res_idx = np.unique(atom_res_idx[nearby_idx])
 
         # if preserve_target == False, don't add the residues of self.residues to the final structure
         if not self.preserve_target:
-            neighbor_residues = [x for x in neighbor_residues if x not in str_residues]
+            nearby_res_idx = nearby_res_idx[~mask[nearby_res_idx]]
+        nearby_residues = {loaded.residues[i] for i in nearby_res_idx}
 
-        fu.log("Found %d nearby residues" % len(neighbor_residues), self.out_log)
+        fu.log("Found %d nearby residues" % len(nearby_residues), self.out_log)
 
-        if len(neighbor_residues) == 0:
+        if len(nearby_residues) == 0:
             fu.log(
                 self.__class__.__name__ + ": No neighbour residues found, exiting",
                 self.out_log,
@@ -194,13 +174,33 @@ class ClosestResidues(BiobbObject):
                 self.__class__.__name__ + ": No neighbour residues found, exiting"
             )
 
-        create_output_file(
-            0,
-            self.stage_io_dict["in"]["input_structure_path"],
-            neighbor_residues,
-            self.stage_io_dict["out"]["output_residues_path"],
-            self.out_log,
-        )
+        if is_valid_pdb(
+            PurePath(self.stage_io_dict["in"]["input_structure_path"]).suffix[1:]
+        ):
+            # write the nearby residues directly from the parsed structure
+            fu.log(
+                "Writting pdb to: %s"
+                % (self.stage_io_dict["out"]["output_residues_path"]),
+                self.out_log,
+            )
+            # keep the MODEL record of single-model inputs that had one
+            io = Bio.PDB.PDBIO(use_model_flag=int(loaded.has_model))
+            io.set_structure(loaded.structure)
+            io.save(
+                self.stage_io_dict["out"]["output_residues_path"],
+                ResidueSelect(nearby_residues),
+                preserve_atom_numbering=True,
+            )
+        else:
+            # PDBIO would drop the extra PDBQT columns, copy the original lines instead
+            create_output_file(
+                0,
+                self.stage_io_dict["in"]["input_structure_path"],
+                [loaded.res_desc[residue] for residue in nearby_residues],
+                self.stage_io_dict["out"]["output_residues_path"],
+                self.out_log,
+                n_models=len(loaded.structure),
+            )
 
         self.return_code = 0
 
@@ -216,6 +216,79 @@ class ClosestResidues(BiobbObject):
         return self.return_code
 
 
+def _file_key(path):
+    """Return the cache key of a file: path, modification time, size and inode"""
+    stat = os.stat(path)
+    return path, stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+
+_LoadedStructure = namedtuple(
+    "_LoadedStructure",
+    "structure res_desc res_arr residues coords atom_res_idx has_model",
+)
+
+
+@functools.lru_cache(maxsize=1)
+def _load_structure(path, mtime_ns, size, ino):
+    """Parse a structure and return it with its residue descriptors, atom coordinates, atom residue indices and whether it had a MODEL record"""
+    structure = Bio.PDB.PDBParser(QUIET=True).get_structure("structure", path)
+
+    # format all residues to pure python objects only once
+    res_desc = {
+        residue: create_biopython_residue(residue)
+        for residue in structure.get_residues()
+    }
+    # same descriptors as a structured array, one field per ResKey field
+    res_arr = np.rec.fromarrays(
+        [np.array(field, dtype=str) for field in zip(*res_desc.values())]
+        if res_desc
+        else [np.empty(0, dtype=str)] * len(ResKey._fields),
+        names=ResKey._fields,
+    )
+
+    # copy coordinates of all atoms into a contiguous array, residues come in atom order
+    residues = list(res_desc)
+    atom_res_idx = np.repeat(
+        np.arange(len(residues), dtype=np.intp), [len(r) for r in residues]
+    )
+    coords = np.empty((len(atom_res_idx), 3), dtype=np.float32)
+    for i, atom in enumerate(structure.get_atoms()):
+        coords[i] = atom.coord
+
+    has_model = _has_model(path)
+
+    return _LoadedStructure(
+        structure, res_desc, res_arr, residues, coords, atom_res_idx, has_model
+    )
+
+
+def _has_model(path):
+    """Return whether the first atom of a structure file is preceded by a MODEL record"""
+    with open(path) as f:
+        for line in f:
+            if line.startswith("MODEL"):
+                return True
+            if line.startswith(("ATOM", "HETATM")):
+                return False
+    return False
+
+
+@functools.lru_cache(maxsize=1)
+def _load_structure_tree(path, mtime_ns, size, ino):
+    """Return the KDTree of the atom coordinates of a structure"""
+    return cKDTree(_load_structure(path, mtime_ns, size, ino).coords)
+
+
+class ResidueSelect(Bio.PDB.Select):
+    """Biopython PDBIO selector accepting only the given residues."""
+
+    def __init__(self, residues):
+        self.residues = residues
+
+    def accept_residue(self, residue):
+        return residue in self.residues
+
+
 def closest_residues(
     input_structure_path: str,
     output_residues_path: str,
@@ -1,5 +1,8 @@
 """Common functions and constants for package biobb_structure_utils.utils"""
 
+import mmap
+import os
+from collections import namedtuple
 from collections.abc import Mapping
 from pathlib import Path, PurePath
 from typing import Optional, Union
@@ -10,6 +13,8 @@ PDB_COORD_RECORDS = ["MODEL", "ANISOU", "HETATM", "ATOM", "TER", "ENDMDL"]
 PDB_SERIAL_RECORDS = ["ANISOU", "HETATM", "ATOM", "TER"]
 PDB_WATERS = ["SOL", "HOH", "WAT", "T3P"]
 
+ResKey = namedtuple("ResKey", "model chain name res_id")
+
 
 def check_input_path(path, out_log, classname):
     """Checks input file path"""
@@ -125,62 +130,97 @@ def check_output_end(structure, out_log):
             f.write("%s\n" % item)
 
 
-def create_output_file(type, input, residues, output, out_log):
-    # parse PDB file and get residues line by line
-    new_file_lines = []
-    curr_model = 0
-    with open(input) as infile:
-        for line in infile:
-            if line.startswith("MODEL   "):
-                curr_model = line.rstrip()[-1]
-                if int(curr_model) > 1:
-                    new_file_lines.append("ENDMDL\n")
-                new_file_lines.append("MODEL     " + "{:>4}".format(curr_model) + "\n")
-
-            conditional_atoms = [
-                (line.startswith("ATOM") or line.startswith("HETATM")),
-                line.startswith("HETATM"),
-                line.startswith("ATOM"),
-            ]
-
-            if conditional_atoms[type]:
-                name = line[17:20].strip()
-                chain = line[21:22].strip()
-                res_id = line[22:27].strip()
-                if curr_model != 0:
-                    model = curr_model.strip()
-                else:
-                    model = "1"
-                if chain == "":
-                    chain = " "
-
-                for nstr in residues:
-                    if (
-                        nstr["res_id"] == res_id
-                        and nstr["name"] == name
-                        and nstr["chain"] == chain
-                        and nstr["model"] == model
-                    ):
-                        new_file_lines.append(line)
-
-    if int(curr_model) > 0:
-        new_file_lines.append("ENDMDL\n")
+def create_output_file(type, input, residues, output, out_log, n_models=None):
+    # hashable keys of the residues to keep
+    residues_set = frozenset(residues)
+    # records to be filtered for each type: all atoms, heteroatoms, atoms
+    records = ((b"ATOM", b"HETATM"), b"HETATM", b"ATOM")[type]
 
     fu.log("Writting pdb to: %s" % (output), out_log)
 
-    # save new file with heteroatoms
-    with open(output, "w") as outfile:
-        for line in new_file_lines:
-            outfile.write(line)
+    # parse PDB file and write the selected residues line by line
+    # the filter decision is computed once per residue columns of each model
+    # lines are written with LF endings whatever the input uses
+    accepted = {}
+    with open(input, "rb") as infile, open(output, "wb") as outfile:
+        if n_models == 1:
+            # single model structure, residue keys do not depend on the MODEL records
+            curr_model = 0
+            for line in _mmap_lines(infile):
+                if line.startswith(records):
+                    key = line[17:27]
+                    keep = accepted.get(key)
+                    if keep is None:
+                        keep = accepted[key] = (
+                            _line_residue(line, "1") in residues_set
+                        )
+
+                    if keep:
+                        outfile.write(line.rstrip(b"\r\n") + b"\n")
+                elif line.startswith(b"MODEL   "):
+                    # keep the MODEL/ENDMDL pair of explicit single model files
+                    curr_model = line.rstrip()[-1:].decode()
+                    outfile.write(
+                        ("MODEL     " + "{:>4}".format(curr_model) + "\n").encode()
+                    )
+
+            if curr_model != 0:
+                outfile.write(b"ENDMDL\n")
+            return
+
+        curr_model = 0
+        model = "1"
+        for line in _mmap_lines(infile):
+            if line.startswith(b"MODEL   "):
+                curr_model = line.rstrip()[-1:].decode()
+                model = curr_model.strip()
+                # residue columns only identify a residue within its model
+                accepted = {}
+                if int(curr_model) > 1:
+                    outfile.write(b"ENDMDL\n")
+                outfile.write(
+                    ("MODEL     " + "{:>4}".format(curr_model) + "\n").encode()
+                )
+
+            if line.startswith(records):
+                key = line[17:27]
+                keep = accepted.get(key)
+                if keep is None:
+                    keep = accepted[key] = (
+                        _line_residue(line, model) in residues_set
+                    )
+
+                if keep:
+                    outfile.write(line.rstrip(b"\r\n") + b"\n")
+
+        if int(curr_model) > 0:
+            outfile.write(b"ENDMDL\n")
+
+
+def _mmap_lines(infile):
+    """Yields the lines of a binary file through a read-only memory map"""
+    if not os.fstat(infile.fileno()).st_size:
+        return
+    with mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        yield from iter(mm.readline, b"")
+
+
+def _line_residue(line, model):
+    """Returns the ResKey of a PDB ATOM/HETATM line given as bytes"""
+    line = line.decode()
+    chain = line[21:22].strip()
+    if chain == "":
+        chain = " "
+    return ResKey(model, chain, line[17:20].strip(), line[22:27].strip())
 
 
 def create_biopython_residue(residue):
-    return {
-        "model": str(residue.get_parent().get_parent().get_id() + 1),
-        "chain": residue.get_parent().get_id(),
-        "name": residue.get_resname(),
-        "res_id": str(residue.get_id()[1]),
-    }
+    return ResKey(
+        model=str(residue.get_parent().get_parent().get_id() + 1),
+        chain=residue.get_parent().get_id(),
+        name=residue.get_resname(),
+        res_id=str(residue.get_id()[1]),
+    )
 
 
 def create_residues_list(residues, out_log):
@@ -191,9 +231,10 @@ def create_residues_list(residues, out_log):
     list_residues = []
 
     for residue in residues:
-        d = residue
         code = []
         if isinstance(residue, Mapping):
+            # work on a copy, do not modify the user properties
+            d = dict(residue)
             if "name" in residue:
                 code.append("name")
             if "res_id" in residue:
@@ -206,12 +247,29 @@ def create_residues_list(residues, out_log):
             d = {"res_id": str(residue)}
             code.append("res_id")
 
+        # strip once so matching can compare the values directly
+        for c in code:
+            d[c] = str(d[c]).strip()
+        # Biopython uses a blank space as empty chain id
+        if "chain" in code and not d["chain"]:
+            d["chain"] = " "
+
         d["code"] = code
+        d["key_tuple"] = tuple(d[c] for c in code)
         list_residues.append(d)
 
     return list_residues
 
 
+def group_residues_by_code(list_residues):
+    """Group the key tuples of a residues list by their code fields"""
+    requests_by_code = {}
+    for res in list_residues:
+        requests_by_code.setdefault(tuple(res["code"]), set()).add(res["key_tuple"])
+
+    return requests_by_code
+
+
 def check_format_heteroatoms(hets, out_log):
     """Check format of heteroatoms list"""
     if not hets:
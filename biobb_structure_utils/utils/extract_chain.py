@@ -30,7 +30,7 @@ class ExtractChain(BiobbObject):
         properties (dic - Python dictionary object containing the tool parameters, not input/output files):
             * **chains** (*list*) - (None) List of chains to be extracted from the input_structure_path file. If empty, all the chains of the structure will be returned.
             * **permissive** (*bool*) - (False) Use non standard PDB files.
-            * **binary_path** (*string*) - ("check_structure") path to the check_structure application
+            * **binary_path** (*string*) - ("check_structure") path to the check_structure application. Only used when selecting all chains or chain types (ie: protein, na).
             * **remove_tmp** (*bool*) - (True) [WF property] Remove temporal files.
             * **restart** (*bool*) - (False) [WF property] Do not execute if output files exist.
             * **sandbox_path** (*str*) - ("./") [WF property] Parent path to the sandbox directory.
@@ -132,21 +132,39 @@ class ExtractChain(BiobbObject):
                             structure_out.write(line)
 
         else:
-            # run command line
-            self.cmd = [
-                self.binary_path,
-                "-i",
-                self.io_dict["in"]["input_structure_path"],
-                "-o",
-                self.io_dict["out"]["output_structure_path"],
-                "--force_save",
-                "chains",
-                "--select",
-                chains,
-            ]
-
-            # Run Biobb block
-            self.run_biobb()
+            chain_list = chains.replace(" ", "").split(",")
+            if chains.upper() != "ALL" and all(len(c) == 1 for c in chain_list):
+                # plain chain ids, no need to launch the Structure Checking tool
+                if not filter_chains(
+                    self.io_dict["in"]["input_structure_path"],
+                    self.io_dict["out"]["output_structure_path"],
+                    chain_list,
+                ):
+                    fu.log(
+                        self.__class__.__name__
+                        + ": The chains given by user were not found in input structure",
+                        self.out_log,
+                    )
+                    raise SystemExit(
+                        self.__class__.__name__
+                        + ": The chains given by user were not found in input structure"
+                    )
+            else:
+                # run command line
+                self.cmd = [
+                    self.binary_path,
+                    "-i",
+                    self.io_dict["in"]["input_structure_path"],
+                    "-o",
+                    self.io_dict["out"]["output_structure_path"],
+                    "--force_save",
+                    "chains",
+                    "--select",
+                    chains,
+                ]
+
+                # Run Biobb block
+                self.run_biobb()
 
         # Copy files to host
         self.copy_to_host()
@@ -176,6 +194,23 @@ def check_format_chains(chains, out_log):
     return ",".join(chains)
 
 
+def filter_chains(input_path, output_path, chains):
+    """Write the atoms of the given chains keeping header and model records, returns the atoms written"""
+    wanted = set(chains)
+    n_atoms = 0
+    with open(input_path) as structure_in, open(output_path, "w") as structure_out:
+        for line in structure_in:
+            if line.startswith(("ATOM", "HETATM", "ANISOU", "TER")):
+                if line[21:22] in wanted:
+                    structure_out.write(line)
+                    if line.startswith(("ATOM", "HETATM")):
+                        n_atoms += 1
+            elif line.startswith(("HEADER", "TITLE", "MODEL", "ENDMDL", "END")):
+                structure_out.write(line)
+
+    return n_atoms
+
+
 def extract_chain(
     input_structure_path: str,
     output_structure_path: str,
@@ -127,22 +127,22 @@ class ExtractHeteroAtoms(BiobbObject):
                 for het in list_heteroatoms:
                     match = True
                     for code in het["code"]:
-                        if het[code].strip() != r[code].strip():
+                        if het[code].strip() != getattr(r, code).strip():
                             match = False
                             break
 
                     if match:
                         if not self.water and (
-                            r["name"] == "HOH"
-                            or r["name"] == "SOL"
-                            or r["name"] == "WAT"
+                            r.name == "HOH"
+                            or r.name == "SOL"
+                            or r.name == "WAT"
                         ):
                             pass
                         else:
                             new_structure.append(r)
             else:
                 if not self.water and (
-                    r["name"] == "HOH" or r["name"] == "SOL" or r["name"] == "WAT"
+                    r.name == "HOH" or r.name == "SOL" or r.name == "WAT"
                 ):
                     pass
                 else:
@@ -166,6 +166,7 @@ class ExtractHeteroAtoms(BiobbObject):
             new_structure,
             self.stage_io_dict["out"]["output_heteroatom_path"],
             self.out_log,
+            n_models=len(structure),
         )
 
         self.return_code = 0
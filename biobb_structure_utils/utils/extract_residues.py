@@ -125,7 +125,7 @@ class ExtractResidues(BiobbObject):
                 for res in list_residues:
                     match = True
                     for code in res["code"]:
-                        if res[code].strip() != r[code].strip():
+                        if res[code] != getattr(r, code):
                             match = False
                             break
                     if match:
@@ -151,6 +151,7 @@ class ExtractResidues(BiobbObject):
             new_structure,
             self.stage_io_dict["out"]["output_residues_path"],
             self.out_log,
+            n_models=len(structure),
         )
 
         self.return_code = 0
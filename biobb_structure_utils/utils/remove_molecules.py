@@ -127,7 +127,7 @@ class RemoveMolecules(BiobbObject):
                 for res in list_residues:
                     match = True
                     for code in res["code"]:
-                        if res[code].strip() != r[code].strip():
+                        if res[code] != getattr(r, code):
                             match = False
                             break
                     if match:
@@ -148,7 +148,8 @@ class RemoveMolecules(BiobbObject):
             )
 
         # substract residues (remove_structure) from whole_structure
-        new_structure = [x for x in whole_structure if x not in remove_structure]
+        remove_set = set(remove_structure)
+        new_structure = [x for x in whole_structure if x not in remove_set]
 
         create_output_file(
             0,
@@ -156,6 +157,7 @@ class RemoveMolecules(BiobbObject):
             new_structure,
             self.stage_io_dict["out"]["output_molecules_path"],
             self.out_log,
+            n_models=len(structure),
         )
 
         self.return_code = 0
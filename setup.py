@@ -19,7 +19,7 @@ setuptools.setup(
     },
     packages=setuptools.find_packages(exclude=["docs", "test"]),
     package_data={"biobb_structure_utils": ["py.typed"]},
-    install_requires=["biobb_common==5.0.0", "biobb_structure_checking>=3.13.5"],
+    install_requires=["biobb_common==5.0.0", "biobb_structure_checking>=3.13.5", "scipy>=1.6"],
     python_requires=">=3.9",
     entry_points={
         "console_scripts": [